@@ -1,9 +1,13 @@
 import click
 from collections import Counter
-from typing import List, Tuple
+from typing import Dict, List, Tuple, TYPE_CHECKING
 
+import gitprivacy.utils as utils
 from .utils import assertCommits
 
+if TYPE_CHECKING:
+    import git_filter_repo as fr  # type: ignore
+
 
 class EmailRedactParamType(click.ParamType):
     name = 'emailredact'
@@ -49,8 +53,12 @@ def redact_email(ctx: click.Context,
 
     assertCommits(ctx)
     repo = ctx.obj.repo
+    if utils.is_dirty(repo):
+        click.echo("Cannot redact: You have unstaged changes.", err=True)
+        ctx.exit(1)
 
-    env_cmd = ""
+    # map old emails to their replacement email and name
+    replacements: Dict[bytes, Tuple[bytes, bytes]] = {}
     with click.progressbar(addresses,
                            label="Redacting emails") as bar:
         for old, new, name in bar:
@@ -58,23 +66,34 @@ def redact_email(ctx: click.Context,
                 new = GHNOREPLY.format(username=new)
             if not new:
                 new = replacement
-            env_cmd += get_env_cmd("COMMITTER", old, new, name)
-            env_cmd += get_env_cmd("AUTHOR", old, new, name)
-    filter_cmd = ["git", "filter-branch", "-f",
-                  "--env-filter", env_cmd,
-                  "--",
-                  "HEAD"]
-    repo.git.execute(command=filter_cmd)
+            # the first mapping given for an address takes precedence
+            replacements.setdefault(old.encode(),
+                                    (new.encode(), name.encode()))
 
+    def redact(commit: "fr.Commit", _metadata) -> None:
+        author = replacements.get(commit.author_email)
+        if author:
+            commit.author_email, name = author
+            if name:
+                commit.author_name = name
+        committer = replacements.get(commit.committer_email)
+        if committer:
+            commit.committer_email, name = committer
+            if name:
+                commit.committer_name = name
 
-def get_env_cmd(role: str, old: str, new: str, name: str) -> str:
-    name_env = f'GIT_{role}_NAME="{name}"'
-    return (
-        f'if test "$GIT_{role}_EMAIL" = "{old}"; then '
-        f'export GIT_{role}_EMAIL="{new}" '
-        f'{name_env if name else ""}; '
-        'fi; '
-    )
+    # slow to import; listing emails does not need it
+    import git_filter_repo as fr  # type: ignore
+    args = fr.FilteringOptions.parse_args([
+        '--source', repo.git_dir,
+        '--force',
+        '--quiet',
+        '--preserve-commit-encoding',
+        '--replace-refs', 'update-no-add',
+        '--refs', 'HEAD',
+    ])
+    rfilter = fr.RepoFilter(args, commit_callback=redact)
+    rfilter.run()
 
 
 @click.command('list-email')
@@ -87,7 +106,8 @@ def list_email(ctx: click.Context, check_all: bool, email_only: bool) -> None:
     """List all author and committer identities."""
     assertCommits(ctx)
     repo = ctx.obj.repo
-    commits = repo.iter_commits("HEAD" if not check_all else "--all")
+    commits = utils.iter_commit_infos(
+        repo, "HEAD" if not check_all else "--all")
     authors: Counter[str] = Counter()
     committers: Counter[str] = Counter()
     if email_only:
@@ -33,7 +33,7 @@ def manage_keys(ctx: click.Context, mode: str, archive: bool) -> None:
     # pylint: disable=too-many-branches
     ctx.obj.assert_repo()
     repo: git.Repo = ctx.obj.repo
-    gpm._create_git_subdir(repo)
+    gpm._create_git_subdir(ctx)
     base = repo.git_dir
     _keydir, archivedir = _setup_keydir(base)
     cur_path = os.path.join(base, KEY_CURRENT)
@@ -103,15 +103,14 @@ def manage_keys(ctx: click.Context, mode: str, archive: bool) -> None:
         click.echo("Key disabled")
     else:
         raise ValueError("Unexpected value for mode")
+    ctx.obj.invalidate()  # providers must pick up the changed keys
 
 
 def _setup_keydir(base: str) -> Tuple[str, str]:
     keydir = os.path.join(base, KEY_DIR)
-    if not os.path.exists(keydir):
-        os.mkdir(keydir, mode=0o700)
+    os.makedirs(keydir, mode=0o700, exist_ok=True)
     archivedir = os.path.join(base, KEY_ARCHIVE)
-    if not os.path.exists(archivedir):
-        os.mkdir(archivedir, mode=0o700)
+    os.makedirs(archivedir, mode=0o700, exist_ok=True)
     return (keydir, archivedir)
 
 
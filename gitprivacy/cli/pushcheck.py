@@ -1,6 +1,6 @@
 import sys
 
-from typing import List, Optional, Set
+from typing import List, Optional
 
 import click
 import git  # type: ignore
@@ -92,7 +92,7 @@ def check_push_line(ctx: click.Context, remote_name: str, line: str) -> None:
     # check for unredated commits
     redacter = ctx.obj.get_dateredacter()
     found_dirty = False
-    for commit in repo.iter_commits(rev=refs):
+    for commit in utils.iter_commit_infos(repo, refs):
         is_redacted = utils.is_already_redacted(redacter, commit)
         if not is_redacted:
             if not found_dirty:
@@ -112,7 +112,8 @@ def check_push_line(ctx: click.Context, remote_name: str, line: str) -> None:
     # because lref is already on the remote.
     # Rational: The dates are already public, ergo: no additional harm.
     if lref.startswith(TAG_PREFIX):
-        if list_containing_branches(repo, lhash, f"{remote_name}/*"):
+        if utils.has_containing_ref(repo, lhash,
+                                    f"refs/remotes/{remote_name}"):
             # lref is already on this remote - allow
             ctx.exit(0)
 
@@ -144,14 +145,21 @@ def _is_parent_of(commit: git.Commit, child: git.Commit) -> bool:
 
 def list_containing_remote_branches(repo: git.Repo, revs: str) -> List[str]:
     """Identify remote branches that contain commits of the given rev."""
-    branches: Set[str] = set()
-    commits_remote = list(repo.iter_commits([revs, "--remotes"]))
-    for commit in commits_remote:
-        branches.update(list_containing_branches(repo, commit.hexsha))
-    return list(branches)
-
-
-def list_containing_branches(repo: git.Repo, hexsha: str,
-                             pattern="*") -> List[str]:
-    out = repo.git.branch(["-r", "--contains", hexsha, pattern])
+    # Any branch containing one of the commits also contains the oldest
+    # ones, i.e., those without parents in the set, so only query those.
+    out = repo.git.rev_list(["--parents", revs, "--remotes"])
+    commit_parents = {
+        hexsha: parents
+        for hexsha, *parents in (line.split() for line in out.splitlines())
+    }
+    oldest = [
+        hexsha for hexsha, parents in commit_parents.items()
+        if not any(p in commit_parents for p in parents)
+    ]
+    if not oldest:
+        return []
+    args = ["-r"]
+    for hexsha in oldest:
+        args.extend(("--contains", hexsha))
+    out = repo.git.branch(args)
     return [b.strip() for b in out.splitlines()]
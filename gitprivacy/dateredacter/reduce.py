@@ -1,21 +1,56 @@
 from datetime import datetime
+from typing import Dict
 import re
 
 from . import DateRedacter
 
 
+# timestamp fields reset per pattern character
+PATTERN_FIELDS = {
+    "M": ("month", 1),
+    "d": ("day", 1),
+    "h": ("hour", 0),
+    "m": ("minute", 0),
+    "s": ("second", 0),
+}
+LIMIT_REGEX = re.compile('([0-9]+)-([0-9]+)')
+
+
 class ResolutionDateRedacter(DateRedacter):
     """Resolution reducing timestamp redacter."""
     def __init__(self, pattern="s", limit=None, mode="reduce"):
         self.mode = mode
         self.pattern = pattern
         self.limit = limit
-        if limit:
+        self._replacements = dict(
+            field for char, field in PATTERN_FIELDS.items() if char in pattern
+        )
+        if isinstance(limit, (tuple, list)):
+            start, end = limit
+            self.limit = (int(start), int(end))
+        elif limit:
             try:
-                match = re.search('([0-9]+)-([0-9]+)', str(limit))
+                match = LIMIT_REGEX.search(str(limit))
                 self.limit = (int(match.group(1)), int(match.group(2)))
             except AttributeError:
                 raise ValueError("Unexpected syntax for limit.")
+        self._limit_fixups = self._get_limit_fixups()
+
+    def _get_limit_fixups(self) -> Dict[int, int]:
+        """Map each hour outside the limit to the hour it is clamped to."""
+        fixups: Dict[int, int] = {}
+        if not self.limit:
+            return fixups
+        start, end = self.limit
+        for hour in range(24):
+            new_hour = hour
+            if new_hour < start:
+                new_hour = start
+            if new_hour >= end:
+                new_hour = end
+            if new_hour != hour or hour >= end:
+                fixups[hour] = new_hour
+        return fixups
 
     def redact(self, timestamp: datetime) -> datetime:
         """Reduces timestamp precision for the parts specifed by the pattern using
@@ -23,25 +58,13 @@ class ResolutionDateRedacter(DateRedacter):
 
         Example: A pattern of 's' sets the seconds to 0."""
 
-        if "M" in self.pattern:
-            timestamp = timestamp.replace(month=1)
-        if "d" in self.pattern:
-            timestamp = timestamp.replace(day=1)
-        if "h" in self.pattern:
-            timestamp = timestamp.replace(hour=0)
-        if "m" in self.pattern:
-            timestamp = timestamp.replace(minute=0)
-        if "s" in self.pattern:
-            timestamp = timestamp.replace(second=0)
+        if self._replacements:
+            timestamp = timestamp.replace(**self._replacements)
         timestamp = self._enforce_limit(timestamp)
         return timestamp
 
     def _enforce_limit(self, timestamp: datetime) -> datetime:
-        if not self.limit:
-            return timestamp
-        start, end = self.limit
-        if timestamp.hour < start:
-            timestamp = timestamp.replace(hour=start, minute=0, second=0)
-        if timestamp.hour >= end:
-            timestamp = timestamp.replace(hour=end, minute=0, second=0)
-        return timestamp
+        new_hour = self._limit_fixups.get(timestamp.hour)
+        if new_hour is None:
+            return timestamp  # within limits
+        return timestamp.replace(hour=new_hour, minute=0, second=0)
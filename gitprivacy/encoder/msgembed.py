@@ -12,6 +12,8 @@ from ..dateredacter import DateRedacter
 
 MSG_TAG = "GitPrivacy: "
 TAG_REGEX = fr'^{MSG_TAG}(\S+)(?: (\S+))?'
+_TAG_RE = re.compile(TAG_REGEX, re.MULTILINE)
+_TAG_LINE = "\n" + MSG_TAG
 
 
 class MessageEmbeddingEncoder(BasicEncoder):
@@ -38,8 +40,7 @@ class MessageEmbeddingEncoder(BasicEncoder):
         ad_cipher, _cd_cipher = ciphers
         c_date = _encrypt_for_msg(self.crypto, commit.committed_datetime)
         new_extra = f"{MSG_TAG}{ad_cipher} {c_date}"
-        return lambda msg: re.sub(TAG_REGEX, new_extra, msg,
-                                  flags=re.MULTILINE)
+        return lambda msg: _TAG_RE.sub(new_extra, msg)
 
 
 class MessageEmbeddingDecoder(Decoder):
@@ -52,8 +53,8 @@ class MessageEmbeddingDecoder(Decoder):
 
 
 def _contains_tag(commit: git.Commit):
-    return any([line.startswith(MSG_TAG)
-                for line in commit.message.splitlines()])
+    msg = commit.message
+    return msg.startswith(MSG_TAG) or _TAG_LINE in msg
 
 
 def _extract_enc_dates(msg: str) -> Optional[Tuple[str, Optional[str]]]:
@@ -62,13 +63,12 @@ def _extract_enc_dates(msg: str) -> Optional[Tuple[str, Optional[str]]]:
     Returns either a combined cipher for author and committer date or one
     separate cipher each if present.
     """
-    for line in msg.splitlines():
-        # 2nd cipher is optional for backward compatability with
-        # combined author and committer date ciphers
-        match = re.search(TAG_REGEX, line)
-        if match:
-            ad_cipher, cd_cipher = match.groups()
-            return (ad_cipher, cd_cipher)
+    # 2nd cipher is optional for backward compatability with
+    # combined author and committer date ciphers
+    match = _TAG_RE.search(msg)
+    if match:
+        ad_cipher, cd_cipher = match.groups()
+        return (ad_cipher, cd_cipher)
     return None
 
 
@@ -81,8 +81,11 @@ def _decrypt_from_msg(crypto: DecryptionProvider, message: str) -> Tuple[
         Optional[datetime],
         Optional[datetime],
 ]:
+    if crypto is None or MSG_TAG not in message:
+        # cheap substring test spares the line scan for untagged commits
+        return (None, None)
     enc_dates = _extract_enc_dates(message)
-    if crypto is None or enc_dates is None:
+    if enc_dates is None:
         return (None, None)
     enc_adate, enc_cdate = enc_dates
     raw_adate = crypto.decrypt(enc_adate)
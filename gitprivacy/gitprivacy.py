@@ -4,17 +4,17 @@ git privacy
 """
 import click
 import git  # type: ignore
+import itertools
 import os
-import shutil
 import stat
 import sys
 
 from datetime import datetime, timezone
-from pkg_resources import resource_stream, resource_string
-from typing import Optional, TextIO, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
 
 
 from . import GIT_SUBDIR
+from . import utils
 from . import crypto as crypt
 from .cli import email
 from .cli import keys
@@ -34,26 +34,33 @@ class GitPrivacyConfig:
 
     def __init__(self, gitdir: str) -> None:
         self.gitdir = gitdir
+        # memoized providers; deriving a password key is expensive
+        self._cache: Dict[str, Any] = {}
         try:
             self.repo = git.Repo(gitdir, search_parent_directories=True)
         except git.InvalidGitRepositoryError as e:
             self.repo = None
         else:
+            self.subdir = os.path.join(self.repo.git_dir, GIT_SUBDIR)
+            self.rewrites_log_path = os.path.join(self.subdir, "rewrites")
             self.read_config()
 
 
     def read_config(self):
         self.assert_repo()
         with self.repo.config_reader() as config:
-            self.mode = config.get_value(self.SECTION, 'mode', 'reduce')
-            self.pattern = config.get_value(self.SECTION, 'pattern', '')
-            self.limit = config.get_value(self.SECTION, 'limit', '')
-            self.password = config.get_value(self.SECTION, 'password', '')
-            self.salt = config.get_value(self.SECTION, 'salt', '')
-            self.ignoreTimezone = bool(config.get_value(
-                self.SECTION, 'ignoreTimezone', True))
-            self.replace = bool(config.get_value(
-                self.SECTION, 'replacements', False))
+            # read both sections in one pass instead of a lookup per option
+            privacy = _config_section(config, self.SECTION)
+            user = _config_section(config, "user")
+        self.mode = privacy.get('mode', 'reduce')
+        self.pattern = privacy.get('pattern', '')
+        self.limit = privacy.get('limit', '')
+        self.password = privacy.get('password', '')
+        self.salt = privacy.get('salt', '')
+        self.ignoreTimezone = _config_bool(
+            privacy.get('ignoreTimezone'), True)
+        self.replace = _config_bool(privacy.get('replacements'), False)
+        self.user_email = _sanitize_config_email(user.get("email", ""))
 
     def assert_repo(self):
         if not self.repo:
@@ -61,6 +68,11 @@ class GitPrivacyConfig:
 
     def get_crypto(self) -> Optional[crypt.EncryptionProvider]:
         self.assert_repo()
+        if "crypto" not in self._cache:
+            self._cache["crypto"] = self._load_crypto()
+        return self._cache["crypto"]
+
+    def _load_crypto(self) -> Optional[crypt.EncryptionProvider]:
         if self.password:
             if not self.salt:
                 self.salt = crypt.PasswordSecretBox.generate_salt()
@@ -74,6 +86,11 @@ class GitPrivacyConfig:
 
     def get_decrypto(self) -> Optional[crypt.DecryptionProvider]:
         self.assert_repo()
+        if "decrypto" not in self._cache:
+            self._cache["decrypto"] = self._load_decrypto()
+        return self._cache["decrypto"]
+
+    def _load_decrypto(self) -> Optional[crypt.DecryptionProvider]:
         # try to get a EncryptionProvider, then fallback to DecryptionProvider
         crypto = self.get_crypto()
         if crypto:
@@ -83,6 +100,11 @@ class GitPrivacyConfig:
 
     def get_dateredacter(self) -> DateRedacter:
         self.assert_repo()
+        if "dateredacter" not in self._cache:
+            self._cache["dateredacter"] = self._load_dateredacter()
+        return self._cache["dateredacter"]
+
+    def _load_dateredacter(self) -> DateRedacter:
         if self.mode == "reduce" and self.pattern == '':
             raise click.ClickException(click.wrap_text(
                 "Missing pattern configuration. Set a reduction pattern using\n"  # noqa: E501
@@ -95,12 +117,17 @@ class GitPrivacyConfig:
                 preserve_paragraphs=True))
         return ResolutionDateRedacter(self.pattern, self.limit, self.mode)
 
+    def invalidate(self) -> None:
+        """Drop memoized providers after a config or key change."""
+        self._cache.clear()
+
     def write_config(self, **kwargs):
         """Write config"""
         self.assert_repo()
         with self.repo.config_writer(config_level='repository') as writer:
             for key, value in kwargs.items():
                 writer.set_value(self.SECTION, key, value)
+        self.invalidate()
 
     def comment_out_password_options(self):
         self.assert_repo()
@@ -113,6 +140,20 @@ class GitPrivacyConfig:
                 config.remove_option(self.SECTION, 'salt')
                 config.set_value(self.SECTION, "#salt", self.salt)
                 self.salt = ""
+        self.invalidate()
+
+
+def _config_section(config: git.GitConfigParser,
+                    section: str) -> Dict[str, str]:
+    if not config.has_section(section):
+        return {}
+    return dict(config.items(section))
+
+
+def _config_bool(value: Optional[str], default: bool) -> bool:
+    if value is None:
+        return default
+    return value.strip().lower() not in ("false", "no", "off", "0", "")
 
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
@@ -179,14 +220,16 @@ def get_template_dir(repo: git.Repo) -> str:
 
 
 def copy_hook(git_path: str, hook: str, ) -> None:
+    # imported lazily: pkg_resources is slow and only needed by init
+    from pkg_resources import resource_string
+    hook_bytes = resource_string('gitprivacy.resources.hooks', hook)
     hookdir = os.path.join(git_path, "hooks")
-    if not os.path.exists(hookdir):
-        os.mkdir(hookdir)
+    os.makedirs(hookdir, exist_ok=True)
     hook_fn = os.path.join(hookdir, hook)
     try:
         dst = open(hook_fn, "xb")
     except FileExistsError:
-        hook_txt = resource_string('gitprivacy.resources.hooks', hook).decode()
+        hook_txt = hook_bytes.decode()
         with open(hook_fn, "r") as f:
             if f.read() == hook_txt:
                 print(f"{hook} hook is already installed at {hook_fn}.")
@@ -196,8 +239,8 @@ def copy_hook(git_path: str, hook: str, ) -> None:
               f"hook:\n\n{hook_txt}")
         return
     else:
-        with resource_stream('gitprivacy.resources.hooks', hook) as src, dst:
-            shutil.copyfileobj(src, dst)  # type: ignore
+        with dst:
+            dst.write(hook_bytes)
             os.chmod(hook_fn, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP |
                      stat.S_IROTH | stat.S_IXOTH)  # mode 755
             print("Installed {} hook".format(hook))
@@ -218,34 +261,49 @@ def do_log(ctx: click.Context, revision_range: str, paths: click.Path):
         decoder: Decoder = MessageEmbeddingDecoder(crypto)
     else:
         decoder = BasicDecoder()
-    commit_list = list(repo.iter_commits(rev=revision_range, paths=paths))
+    commits = utils.iter_commit_infos(repo, revision_range, paths)
+    # take the first entry before starting the pager so that an invalid
+    # revision range fails here and not within the pager
+    first = next(commits, None)
+
+    def log_entries() -> Iterator[str]:
+        # stream entries to the pager while walking the history
+        if first is None:
+            return
+        yield _format_log_entry(first, decoder)
+        for commit in commits:
+            yield os.linesep + _format_log_entry(commit, decoder)
+    click.echo_via_pager(log_entries())
+
+
+def _format_log_entry(commit: utils.CommitInfo, decoder: Decoder) -> str:
     buf = list()
-    for commit in commit_list:
-        buf.append(click.style(f"commit {commit.hexsha}", fg='yellow'))
-        a_date, c_date = decoder.decode(commit)
-        if a_date:
-            buf.append(f"Author:   {commit.author.name} <{commit.author.email}>")  # noqa: E501
-            buf.append(click.style(f"Date: {fmtdate(commit.authored_datetime)}",  # noqa: E501)
-                                   fg='red'))
-            buf.append(click.style(f"RealDate: {fmtdate(a_date)}", fg='green'))
-        else:
-            buf.append(f"Author: {commit.author.name} <{commit.author.email}>")
-            buf.append(f"Date:   {fmtdate(commit.authored_datetime)}")
-        if c_date:
-            buf.append(f"Commit:   {commit.committer.name} <{commit.committer.email}>")  # noqa: E501
-            buf.append(click.style(f"Date: {fmtdate(commit.committed_datetime)}",  # noqa: E501)
-                                   fg='red'))
-            buf.append(click.style(f"RealDate: {fmtdate(c_date)}", fg='green'))
-        else:
-            buf.append(f"Commit: {commit.committer.name} <{commit.committer.email}>")
-            buf.append(f"Date:   {fmtdate(commit.committed_datetime)}")
-        buf.append(os.linesep + f"    {commit.message}")
-    click.echo_via_pager(os.linesep.join(buf))
+    buf.append(click.style(f"commit {commit.hexsha}", fg='yellow'))
+    # decoders only read the dates and the message
+    a_date, c_date = decoder.decode(commit)  # type: ignore
+    if a_date:
+        buf.append(f"Author:   {commit.author.name} <{commit.author.email}>")  # noqa: E501
+        buf.append(click.style(f"Date: {fmtdate(commit.authored_datetime)}",  # noqa: E501)
+                               fg='red'))
+        buf.append(click.style(f"RealDate: {fmtdate(a_date)}", fg='green'))
+    else:
+        buf.append(f"Author: {commit.author.name} <{commit.author.email}>")
+        buf.append(f"Date:   {fmtdate(commit.authored_datetime)}")
+    if c_date:
+        buf.append(f"Commit:   {commit.committer.name} <{commit.committer.email}>")  # noqa: E501
+        buf.append(click.style(f"Date: {fmtdate(commit.committed_datetime)}",  # noqa: E501)
+                               fg='red'))
+        buf.append(click.style(f"RealDate: {fmtdate(c_date)}", fg='green'))
+    else:
+        buf.append(f"Commit: {commit.committer.name} <{commit.committer.email}>")
+        buf.append(f"Date:   {fmtdate(commit.committed_datetime)}")
+    buf.append(os.linesep + f"    {commit.message}")
+    return os.linesep.join(buf)
 
 
 def _is_cherrypick_finished(repo: git.Repo) -> bool:
     cherrypick_head = os.path.join(repo.git_dir, "CHERRY_PICK_HEAD")
-    return os.path.exists(cherrypick_head) is False
+    return not os.path.lexists(cherrypick_head)
 
 
 @cli.command('redate')
@@ -289,11 +347,11 @@ def do_redate(ctx: click.Context, startpoint: str,
         amendrewriter.rewrite()
         return
 
-    if repo.is_dirty():
+    if utils.is_dirty(repo):
         click.echo(f"Cannot redate: You have unstaged changes.", err=True)
         ctx.exit(1)
     rewriter = FilterRepoRewriter(repo, encoder, ctx.obj.replace)
-    single_commit = next(repo.head.commit.iter_parents(), None) is None
+    single_commit = not repo.head.commit.parents
     try:
         if startpoint and not single_commit:
             if not repo.is_ancestor(startpoint, "HEAD"):
@@ -306,23 +364,25 @@ def do_redate(ctx: click.Context, startpoint: str,
                 # Enforce validity of user-defined startpoint
                 # to give proper feedback
                 repo.commit(startpoint)
-        commits = list(repo.iter_commits(rev))
+        count = int(repo.git.rev_list("--count", rev))
     except (git.GitCommandError, git.BadName):
         click.echo(f"bad revision '{startpoint}'", err=True)
         ctx.exit(128)
-    if len(commits) == 0:
+    if count == 0:
         click.echo(f"Found nothing to redate for '{rev}'", err=True)
         ctx.exit(128)
-    remotes = repo.git.branch(["-r", "--contains", commits[-1].hexsha])
-    if remotes and not force:
+    # stream commits startpoint first, HEAD last
+    commits = repo.iter_commits(rev, reverse=True)
+    first = next(commits)
+    if utils.has_containing_ref(repo, first.hexsha) and not force:
         click.echo(
             "You are trying to redate commits contained in remote branches.\n"
             "Use '-f' to proceed if you are really sure.",
             err=True
         )
         ctx.exit(3)
-    # add commits in reversed order to rewriter startpoint first, HEAD last
-    with click.progressbar(reversed(commits), label="Redating commits") as bar:
+    with click.progressbar(itertools.chain([first], commits), length=count,
+                           label="Redating commits") as bar:
         for commit in bar:
             rewriter.update(commit)
     rewriter.finish()
@@ -334,22 +394,27 @@ def redate_rewrites(ctx: click.Context):
     """Redact committer timestamps of rewritten commits."""
     assertCommits(ctx)
     repo = ctx.obj.repo
-    rewrites_log_path = os.path.join(repo.git_dir, GIT_SUBDIR, "rewrites")
+    rewrites_log_path = ctx.obj.rewrites_log_path
     if not os.path.exists(rewrites_log_path):
         click.echo("No pending rewrites to redact")
         ctx.exit(0)
-    if repo.is_dirty():
+    if utils.is_dirty(repo):
         click.echo(f"Cannot redate: You have unstaged changes.", err=True)
         ctx.exit(1)
 
     # determine commits to redate
+    olds_set: Set[str] = set()
+    news: List[str] = []
     with open(rewrites_log_path, "r") as rwlog_fp:
-        rwlog = list(map(_parse_post_rewrite_format, rwlog_fp))
-    olds_set = set(e[0] for e in rwlog)
-    news = [e[1] for e in rwlog]
-    news_set = set(news)
-    pending_set = news_set.difference(olds_set)  # ignore already rewritten news
-    pending = [noid for noid in news if noid in pending_set]
+        for line in rwlog_fp:
+            old, new, _ = _parse_post_rewrite_format(line)
+            olds_set.add(old)
+            news.append(new)
+    # ignore already rewritten news; squashes log the same new commit
+    # once per folded commit, so keep only its first occurrence
+    pending = list(dict.fromkeys(
+        noid for noid in news if noid not in olds_set
+    ))
 
     if len(pending) == 0:
         click.echo("No pending rewrites to redact")
@@ -403,18 +468,20 @@ def check_timezone_changes(ctx: click.Context) -> bool:
     repo = ctx.obj.repo
     if not repo.head.is_valid():
         return False  # no previous commits
-    with repo.config_reader() as cr:
-        user_email = _sanitize_config_email(
-            cr.get_value("user", "email", "")
-        )
+    user_email = ctx.obj.user_email
     if not user_email:
         click.echo("No user email set.", err=True)
         ctx.exit(128)
-    user_commits = repo.iter_commits(
+    user_commits = utils.iter_commit_infos(
+        repo, "HEAD",
+        max_count=1,
         author=f"<{user_email}>",
         committer=f"<{user_email}>",
     )
-    last_commit = next(user_commits, None)
+    try:
+        last_commit = next(user_commits, None)
+    finally:
+        user_commits.close()  # reap the git process
     if last_commit is None:
         click.echo("info: Skipping tzcheck - no previous commits with this email", err=True)
         return False  # no previous commits by this user
@@ -448,10 +515,9 @@ def log_rewrites(ctx: click.Context, rewrites: TextIO, type: str):
     # log rewrites
     repo: git.Repo = ctx.obj.repo
     redacter = ctx.obj.get_dateredacter()
-    subdir = _create_git_subdir(repo)
-    rewrites_log_path = os.path.join(subdir, "rewrites")
+    _create_git_subdir(ctx)
     found_dirty_dates = False
-    with open(rewrites_log_path, "a") as log:
+    with open(ctx.obj.rewrites_log_path, "a") as log:
         for rewrite in rewrites:
             _oldhex, newhex, _ = _parse_post_rewrite_format(rewrite)
             if _has_dirtydate(repo, redacter, newhex):
@@ -467,10 +533,9 @@ To apply date redaction on these dates run
 Warning: This alters your Git history.""", err=True)
 
 
-def _create_git_subdir(repo: git.Repo) -> str:
-    path = os.path.join(repo.git_dir, GIT_SUBDIR)
-    if not os.path.exists(path):
-        os.mkdir(path)
+def _create_git_subdir(ctx: click.Context) -> str:
+    path = ctx.obj.subdir
+    os.makedirs(path, exist_ok=True)
     return path
 
 
@@ -494,16 +559,17 @@ def _has_dirtydate(repo: git.Repo, redacter: DateRedacter,
         # commit no longer locatable
         # nothing to be dirty
         return False
+    # check if commit date is already redacted
+    # (done first as it is far cheaper than the branch lookup below)
+    new_cd = redacter.redact(commit.committed_datetime)
+    if new_cd == commit.committed_datetime:
+        return False
     # check if commit is already loose, i.e. not part of any branch
     # (e.g., due to post-commit hook rewrites in the meantime)
     if not repo.git.branch("--contains", commit.hexsha):
         # do not warn about loose rewritten commits
         return False
-    # check if commit date is already redacted
-    new_cd = redacter.redact(commit.committed_datetime)
-    if new_cd != commit.committed_datetime:
-        return True  # commit date is dirty
-    return False
+    return True  # commit date is dirty
 
 
 cli.add_command(email.redact_email)
@@ -2,14 +2,16 @@
 Bulk rewriting of Git history using git-filter-repo
 """
 import git  # type: ignore
-import git_filter_repo as fr  # type: ignore
 
-from typing import List, Set
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 from . import Rewriter
 from .. import utils
 from ..encoder import Encoder
 
+if TYPE_CHECKING:
+    import git_filter_repo as fr  # type: ignore
+
 
 class FilterRepoRewriter(Rewriter):
     """Redates commits using git-filter-repo."""
@@ -17,33 +19,49 @@ class FilterRepoRewriter(Rewriter):
     def __init__(self, repo: git.Repo, encoder: Encoder,
                  replace: bool = False) -> None:
         super().__init__(repo, encoder, replace)
-        self.commits_to_rewrite: List[git.Commit] = []
-        self.commits_oid_set: Set[str] = set()
+        # only the range bounds are needed to select refs for filter-repo
+        self.first: Optional[git.Commit] = None
+        self.last: Optional[git.Commit] = None
+        # encoded (author date, committer date, message) per commit;
+        # keyed by bytes to match fast-export's original_id
+        self.rewrites: Dict[bytes, Tuple[bytes, bytes, Optional[bytes]]] = {}
         self.with_initial_commit = False
 
 
     def update(self, commit: git.Commit) -> None:
         if not commit.parents:
             self.with_initial_commit = True
-        self.commits_to_rewrite.append(commit)
-        self.commits_oid_set.add(commit.hexsha)
+        if self.first is None:
+            self.first = commit
+        self.last = commit
+        # encode now while the commit is at hand instead of looking
+        # it up again when filter-repo streams it back
+        a_redacted, c_redacted, new_msg = self.encoder.encode(commit)
+        if (not new_msg and
+                a_redacted == commit.authored_datetime and
+                c_redacted == commit.committed_datetime):
+            return  # already redacted – leave the commit untouched
+        self.rewrites[commit.hexsha.encode()] = (
+            utils.dt2gitdate(a_redacted).encode(),
+            utils.dt2gitdate(c_redacted).encode(),
+            new_msg.encode() if new_msg else None,
+        )
 
-    def _rewrite(self, commit: fr.Commit, _metadata) -> None:
-        hexid = commit.original_id.decode()
-        if hexid not in self.commits_oid_set:
+    def _rewrite(self, commit: "fr.Commit", _metadata) -> None:
+        rewrite = self.rewrites.get(commit.original_id)
+        if rewrite is None:
             # do nothing
             return
-        g_commit = self.repo.commit(hexid)  # get pygit Commit object
-        a_redacted, c_redacted, new_msg = self.encoder.encode(g_commit)
-        commit.author_date = utils.dt2gitdate(a_redacted).encode()
-        commit.committer_date = utils.dt2gitdate(c_redacted).encode()
-        if new_msg:
-            commit.message = new_msg.encode()
+        a_date, c_date, new_msg = rewrite
+        commit.author_date = a_date
+        commit.committer_date = c_date
+        if new_msg is not None:
+            commit.message = new_msg
 
 
     def finish(self) -> None:
-        if not self.commits_to_rewrite:
-            return  # nothing to do
+        if not self.rewrites or self.first is None or self.last is None:
+            return  # nothing to do, e.g., all dates are already redacted
         if self.replace:
             replace_opt = "update-or-add"
         else:
@@ -53,15 +71,18 @@ class FilterRepoRewriter(Rewriter):
         # otherwise filter-repo fails to replace the objects.
         def rev_name(commit: git.Commit) -> str:
             return commit.name_rev.split()[1]
-        first = self.commits_to_rewrite[0]
-        last = self.commits_to_rewrite[-1]
-        assert first == last or first in last.iter_parents(), "Wrong commit order"
+        first = self.first
+        last = self.last
+        assert first == last or self.repo.is_ancestor(first, last), \
+            "Wrong commit order"
         first_rev = rev_name(first)
         last_rev = rev_name(last)
         if self.with_initial_commit:
             refs = last_rev
         else:
             refs = f"{first_rev}^..{last_rev}"  # ^ to include 'first' in the range
+        # imported lazily: slow and only needed for rewrites
+        import git_filter_repo as fr  # type: ignore
         args = fr.FilteringOptions.parse_args([
             '--source', self.repo.git_dir,
             '--force',
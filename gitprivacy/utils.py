@@ -1,4 +1,9 @@
-from datetime import datetime
+import functools
+
+from datetime import datetime, timedelta, timezone
+from typing import (
+    BinaryIO, Iterable, Iterator, NamedTuple, Optional, Union,
+)
 
 import git  # type: ignore
 
@@ -6,30 +11,76 @@ import gitprivacy.dateredacter as dateredacter
 
 
 DATE_FMT = "%a %b %d %H:%M:%S %Y %z"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# NUL-separated commit fields for git log -z; the message goes last
+LOG_FIELDS = ("%H", "%an", "%ae", "%ad", "%cn", "%ce", "%cd", "%B")
+
+
+class CommitInfo(NamedTuple):
+    """Display-only commit metadata read straight from git log."""
+    hexsha: str
+    author: git.Actor
+    authored_datetime: datetime
+    committer: git.Actor
+    committed_datetime: datetime
+    message: str
 
 
 def fmtdate(timestamp: datetime) -> str:
-    return timestamp.strftime(DATE_FMT)
+    # same as strftime(DATE_FMT) but with the %z offset string cached
+    # and fixed English names as git does not parse localised ones
+    offset = _fmt_offset(timestamp.utcoffset())
+    return (f"{_WEEKDAYS[timestamp.weekday()]} {_MONTHS[timestamp.month - 1]}"
+            f" {timestamp.day:02d} {timestamp.hour:02d}:{timestamp.minute:02d}"
+            f":{timestamp.second:02d} {timestamp.year} {offset}")
+
+
+@functools.lru_cache(maxsize=64)
+def _fmt_offset(offset: Optional[timedelta]) -> str:
+    """Format a UTC offset like strftime's %z."""
+    if offset is None:
+        return ""
+    sign = "-" if offset < timedelta(0) else "+"
+    hours, rest = divmod(abs(offset), timedelta(hours=1))
+    minutes, rest = divmod(rest, timedelta(minutes=1))
+    res = f"{sign}{hours:02d}{minutes:02d}"
+    if rest:
+        res += f"{rest.seconds:02d}"
+        if rest.microseconds:
+            res += f".{rest.microseconds:06d}"
+    return res
 
 
 def dt2gitdate(d: datetime) -> str:
     """Returns a UTC Posix timestamp with timezone information"""
-    utc_sec = int(d.timestamp())
-    tz = d.strftime("%z")
-    return f"{utc_sec} {tz}"
+    offset = d.utcoffset()
+    if offset is None:
+        utc_sec = int(d.timestamp())  # naive: interpret as local time
+    else:
+        utc_sec = int((d - EPOCH).total_seconds())
+    return f"{utc_sec} {_fmt_offset(offset)}"
 
 
 def gitdate2dt(string: str) -> datetime:
     """Takes a UTC Posix timestamp with timezone information"""
-    seconds, tz = string.split()
-    return datetime.fromtimestamp(
-        int(seconds),
-        datetime.strptime(tz, "%z").tzinfo,
-    )
+    seconds, _, tz = string.partition(" ")
+    return datetime.fromtimestamp(int(seconds), _parse_tz(tz))
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_tz(tz: str) -> timezone:
+    """Parse a Git [+-]HHMM offset; commits reuse only a handful."""
+    if len(tz) != 5 or tz[0] not in "+-":
+        raise ValueError(f"invalid timezone offset '{tz}'")
+    offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5]))
+    return timezone(-offset if tz[0] == "-" else offset)
 
 
 def is_already_redacted(redacter: dateredacter.DateRedacter,
-                        commit: git.Commit) -> bool:
+                        commit: Union[git.Commit, CommitInfo]) -> bool:
     """Check if the timestamps are already redacted."""
     adate = commit.authored_datetime
     cdate = commit.committed_datetime
@@ -40,6 +91,23 @@ def is_already_redacted(redacter: dateredacter.DateRedacter,
     return False
 
 
+def is_dirty(repo: git.Repo) -> bool:
+    """Check for staged or unstaged changes to tracked files.
+
+    Same as repo.is_dirty() but with a single git call instead of
+    one diff for the index and another for the working tree.
+    """
+    return bool(repo.git.status("--porcelain", "--untracked-files=no"))
+
+
+def has_containing_ref(repo: git.Repo, hexsha: str,
+                       pattern: str = "refs/remotes") -> bool:
+    """Check if any ref matching pattern contains the commit."""
+    return bool(repo.git.for_each_ref(
+        "--count=1", "--format=%(refname)", "--contains", hexsha, pattern,
+    ))
+
+
 def get_named_ref(commit: git.Commit) -> str:
     """Get a user-friendly named ref for the commit."""
     _hexsha, name = commit.name_rev.split(" ")
@@ -50,3 +118,59 @@ def remove_prefix(string: str, prefix: str) -> str:
     if string.startswith(prefix):
         return string[len(prefix):]
     return string
+
+
+def iter_commit_infos(repo: git.Repo, rev: str,
+                      paths: Iterable[str] = (),
+                      **kwargs) -> Iterator[CommitInfo]:
+    """Stream commit metadata from a single git log process.
+
+    Cheaper than GitPython's Commit objects when no rewrite is needed.
+    Additional keyword arguments are passed as options to git log.
+    """
+    # pin config-dependent log behaviour to rev-list's semantics,
+    # e.g., log.mailmap would otherwise affect --author/--committer
+    proc = repo.git.log(
+        rev, "-z", "--date=raw", "--no-show-signature", "--no-use-mailmap",
+        "--format=" + "%x00".join(LOG_FIELDS),
+        "--", *paths,
+        as_process=True,
+        **kwargs,
+    )
+    finished = False
+    try:
+        fields = _split_nul(proc.stdout)
+        for record in zip(*[fields] * len(LOG_FIELDS)):
+            hexsha, an, ae, ad, cn, ce, cd, msg = (
+                field.decode("utf-8", "replace") for field in record
+            )
+            yield CommitInfo(
+                hexsha=hexsha,
+                author=git.Actor(an, ae),
+                authored_datetime=gitdate2dt(ad),
+                committer=git.Actor(cn, ce),
+                committed_datetime=gitdate2dt(cd),
+                message=msg,
+            )
+        finished = True
+    finally:
+        if not finished:
+            # stopped early – stop git and reap it instead of leaving
+            # the process to the garbage collector
+            proc.stdout.close()
+            proc.stderr.close()
+            proc.terminate()
+            proc.proc.wait()
+    proc.wait()  # raises GitCommandError on bad revisions
+
+
+def _split_nul(stream: BinaryIO, bufsize: int = 65536) -> Iterator[bytes]:
+    pending = b""
+    while True:
+        chunk = stream.read(bufsize)
+        if not chunk:
+            break
+        *fields, pending = (pending + chunk).split(b"\0")
+        yield from fields
+    if pending:
+        yield pending
@@ -6,9 +6,14 @@ from gitprivacy.crypto import (PasswordSecretBox, SecretBox, MultiSecretBox,
 
 
 class CryptoTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # key derivation is deliberately slow – derive the shared box once
+        cls.salt = PasswordSecretBox.generate_salt()
+        cls.pwdbox = PasswordSecretBox(cls.salt, "passw0rd")
+
     def test_roundtrip(self):
-        salt = PasswordSecretBox.generate_salt()
-        c = PasswordSecretBox(salt, "passw0rd")
+        c = self.pwdbox
         enc = c.encrypt("foobar")
         self.assertEqual(c.decrypt(enc), "foobar")
         # test keyfile interop
@@ -18,9 +23,8 @@ class CryptoTestCase(unittest.TestCase):
         self.assertEqual(mbox.decrypt(enc2), "foobar")
 
     def test_wrongpwd(self):
-        salt = PasswordSecretBox.generate_salt()
-        c = PasswordSecretBox(salt, "passw0rd")
-        c2 = PasswordSecretBox(salt, "password")
+        c = self.pwdbox
+        c2 = PasswordSecretBox(self.salt, "password")
         enc = c.encrypt("foobar")
         self.assertEqual(c2.decrypt(enc), None)
 
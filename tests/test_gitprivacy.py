@@ -1,20 +1,26 @@
 # pylint: disable=invalid-name,too-many-public-methods,line-too-long
-import copy
+import click
 import git  # type: ignore
 import locale
 import os
 import pathlib
+import shutil
 import time
 import unittest
 
 from click.testing import CliRunner
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional
+from unittest import mock
 
 from gitprivacy.gitprivacy import cli, GitPrivacyConfig
+from gitprivacy.cli.keys import KEY_CURRENT
+from gitprivacy.crypto import SecretBox
 import gitprivacy.utils as utils
 
 
+TESTS_DIR = pathlib.Path(__file__).parent
+
 # make sure no non-local configs are used
 HOME = ".home"
 NO_GLOBAL_CONF_ENV = dict(
@@ -24,49 +30,90 @@ NO_GLOBAL_CONF_ENV = dict(
 )
 
 
+def _get_lang() -> Dict:
+    lc, code = locale.getlocale()
+    if lc and code:
+        lc_str = f"{lc}.{code}"
+    else:
+        lc_str = "C.UTF-8"
+    return dict(LANG=lc_str, LC_ALL=lc_str)
+
+
+# the process locale does not change during the run – look it up once
+LANG_ENV = _get_lang()
+
+
+class CommitSnapshot(NamedTuple):
+    """Fields of a commit captured while it still exists."""
+    hexsha: str
+    authored_date: int
+    authored_datetime: datetime
+    committed_datetime: datetime
+    author: git.Actor
+    committer: git.Actor
+    message: str
+
+    @classmethod
+    def of(cls, commit: git.Commit) -> "CommitSnapshot":
+        return cls(
+            hexsha=commit.hexsha,
+            authored_date=commit.authored_date,
+            authored_datetime=commit.authored_datetime,
+            committed_datetime=commit.committed_datetime,
+            author=commit.author,
+            committer=commit.committer,
+            message=commit.message,
+        )
+
+
 class TestGitPrivacy(unittest.TestCase):
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
+        # process-wide settings that no test alters – apply them once
         os.environ.update(NO_GLOBAL_CONF_ENV)
-        self.home = HOME  # only used for templates
-        self.runner = CliRunner()
         # Prevent gitpython from forcing locales to ascii
-        os.environ.update(self.getLang())
+        os.environ.update(LANG_ENV)
+        # key shared by tests that only need encryption to be enabled
+        cls.key = SecretBox.generate_key()
+        # the runner keeps no state between invocations
+        cls.runner = CliRunner()
 
-    @staticmethod
-    def getLang() -> Dict:
-        lc, code = locale.getlocale()
-        if lc and code:
-            lc_str = f"{lc}.{code}"
-        else:
-            lc_str = "C.UTF-8"
-        return dict(LANG=lc_str, LC_ALL=lc_str)
+    def setUp(self) -> None:
+        self.home = HOME  # only used for templates
 
     def setUpRepo(self) -> None:
         self.repo = git.Repo.init()
         self.git = self.repo.git
-        self.configGit(self.git)
+        self.configGit(self.repo)
 
     @staticmethod
-    def configGit(gitwrap: git.Git) -> None:
-        # set user info
-        gitwrap.config(["user.name", "John Doe"])
-        gitwrap.config(["user.email", "jdoe@example.com"])
+    def configGit(repo: git.Repo) -> None:
+        # set user info in one config write instead of a git call each
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "John Doe")
+            config.set_value("user", "email", "jdoe@example.com")
         # Prevent locale issue when git-privacy is called from hooks
-        gitwrap.update_environment(**TestGitPrivacy.getLang())
+        repo.git.update_environment(**LANG_ENV)
+
+    def installKey(self) -> None:
+        # same layout as 'keys --init' without invoking the command
+        key_path = pathlib.Path(self.repo.git_dir, KEY_CURRENT)
+        key_path.parent.mkdir(parents=True)
+        key_path.write_text(self.key)
 
     def setUpRemote(self, name="origin") -> git.Remote:
         r = git.Repo.init(f"remote_{name}", mkdir=True, bare=True)
         return self.repo.create_remote(name, r.working_dir)
 
     def setConfig(self) -> None:
-        self.git.config(["privacy.pattern", "m,s"])
+        with self.repo.config_writer() as config:
+            config.set_value("privacy", "pattern", "m,s")
 
-    def addCommit(self, filename: str, repo: Optional[git.Repo] = None) -> git.Commit:
+    def addCommit(self, filename: str, repo: Optional[git.Repo] = None) -> CommitSnapshot:
         if not repo:
             repo = self.repo
-        oldcwd = os.getcwd()
-        os.chdir(repo.working_dir)
-        with open(filename, "w") as f:
+        # git commands already run in the repo's working dir
+        with open(os.path.join(repo.working_dir, filename), "w") as f:
             f.write(filename)
         repo.git.add(filename)
         res, _stdout, stderr = repo.git.commit(
@@ -75,13 +122,12 @@ class TestGitPrivacy(unittest.TestCase):
         )
         if res != 0:
             raise RuntimeError("Commit failed %s" % stderr)
-        os.chdir(oldcwd)
         # make sure there are no rewrites logged during normal commits
         self.assertNotIn("redate-rewrites", stderr)
-        # return a copy to avoid errors caused by the fazy loading of the
+        # return a snapshot to avoid errors caused by the lazy loading of the
         # Commit object which in combination with git-filter-repo's eager
         # pruning results in failed lookups of no longer existing hashes
-        return copy.copy(self.repo.head.commit)
+        return CommitSnapshot.of(self.repo.head.commit)
 
     def invoke(self, args):
         return self.runner.invoke(cli, args=args)
@@ -118,9 +164,39 @@ class TestGitPrivacy(unittest.TestCase):
             result = self.invoke('log -r HEAD~1..HEAD -- a')
             self.assertEqual(result.exit_code, 0)
             self.assertEqual(result.output.count("commit"), 0)
+            # invalid ranges must fail before the pager is started
+            with mock.patch.object(click, "echo_via_pager") as pager:
+                result = self.invoke('log -r nosuch')
+            self.assertIsInstance(result.exception, git.GitCommandError)
+            pager.assert_not_called()
             result = self.invoke('log x')
             self.assertEqual(result.exit_code, 2)
 
+    def test_commitinfos(self):
+        with self.runner.isolated_filesystem():
+            self.setUpRepo()
+            self.addCommit("a")
+            self.git.commit(["--allow-empty", "-m", "b\n\nbody\n  indented"],
+                            env={"GIT_AUTHOR_DATE": "2020-03-01T10:11:12+0530"})
+            infos = list(utils.iter_commit_infos(self.repo, "HEAD"))
+            commits = list(self.repo.iter_commits("HEAD"))
+            self.assertEqual(len(infos), len(commits))
+            for info, commit in zip(infos, commits):
+                self.assertEqual(info.hexsha, commit.hexsha)
+                self.assertEqual(info.author, commit.author)
+                self.assertEqual(info.author.email, commit.author.email)
+                self.assertEqual(info.authored_datetime,
+                                 commit.authored_datetime)
+                self.assertEqual(info.committer, commit.committer)
+                self.assertEqual(info.committed_datetime,
+                                 commit.committed_datetime)
+                self.assertEqual(info.message, commit.message)
+            infos = list(utils.iter_commit_infos(self.repo, "HEAD", ["a"]))
+            self.assertEqual(len(infos), 1)
+            self.assertEqual(infos[0].hexsha, commits[-1].hexsha)
+            with self.assertRaises(git.GitCommandError):
+                list(utils.iter_commit_infos(self.repo, "nosuch"))
+
     def test_redateempty(self):
         with self.runner.isolated_filesystem():
             self.setUpRepo()
@@ -143,7 +219,7 @@ class TestGitPrivacy(unittest.TestCase):
             result = self.invoke('redate')
             self.assertEqual(result.exit_code, 0)
             ar = self.repo.head.commit
-            self.assertNotEqual(a, ar)
+            self.assertNotEqual(a.hexsha, ar.hexsha)
             self.assertNotEqual(a.authored_date, ar.authored_date)
             self.assertEqual(ar.authored_datetime,
                              a.authored_datetime.replace(minute=0, second=0))
@@ -158,11 +234,31 @@ class TestGitPrivacy(unittest.TestCase):
             self.assertEqual(result.exit_code, 0)
             ar = self.repo.commit("HEAD^")
             br = self.repo.commit("HEAD")
-            self.assertNotEqual(a, ar)
-            self.assertNotEqual(b, br)
+            self.assertNotEqual(a.hexsha, ar.hexsha)
+            self.assertNotEqual(b.hexsha, br.hexsha)
             self.assertNotEqual(a.authored_date, ar.authored_date)
             self.assertNotEqual(b.authored_date, br.authored_date)
 
+    def test_redatetwice(self):
+        with self.runner.isolated_filesystem():
+            self.setUpRepo()
+            self.setConfig()
+            self.addCommit("a")
+            self.addCommit("b")
+            result = self.invoke('redate')
+            self.assertEqual(result.exit_code, 0)
+            redated = [c.hexsha for c in self.repo.iter_commits()]
+            # filter-repo leaves its state dir behind on every run
+            fr_dir = pathlib.Path(self.repo.git_dir, "filter-repo")
+            self.assertTrue(fr_dir.is_dir())
+            shutil.rmtree(fr_dir)
+            # everything is already redacted – nothing to rewrite
+            result = self.invoke('redate')
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual([c.hexsha for c in self.repo.iter_commits()],
+                             redated)
+            self.assertFalse(fr_dir.exists())
+
     def test_redatehead(self):
         with self.runner.isolated_filesystem():
             self.setUpRepo()
@@ -173,8 +269,8 @@ class TestGitPrivacy(unittest.TestCase):
             self.assertEqual(result.exit_code, 0)
             ar = self.repo.commit("HEAD^")
             br = self.repo.commit("HEAD")
-            self.assertEqual(a, ar)
-            self.assertNotEqual(b, br)
+            self.assertEqual(a.hexsha, ar.hexsha)
+            self.assertNotEqual(b.hexsha, br.hexsha)
             self.assertEqual(a.authored_date, ar.authored_date)
             self.assertNotEqual(b.authored_date, br.authored_date)
 
@@ -186,7 +282,7 @@ class TestGitPrivacy(unittest.TestCase):
             result = self.invoke('redate --only-head')
             self.assertEqual(result.exit_code, 0)
             ar = self.repo.commit("HEAD")
-            self.assertNotEqual(a, ar)
+            self.assertNotEqual(a.hexsha, ar.hexsha)
             self.assertNotEqual(a.authored_date, ar.authored_date)
 
     def test_redateheadwithunstagedchanges(self):
@@ -204,7 +300,7 @@ class TestGitPrivacy(unittest.TestCase):
             self.assertEqual(result.exception, None)
             self.assertEqual(result.exit_code, 0)
             ar = self.repo.commit("HEAD")
-            self.assertNotEqual(a, ar)
+            self.assertNotEqual(a.hexsha, ar.hexsha)
             self.assertNotEqual(a.authored_date, ar.authored_date)
 
     def test_redateheadempty(self):
@@ -216,7 +312,7 @@ class TestGitPrivacy(unittest.TestCase):
             result = self.invoke('redate --only-head')
             self.assertEqual(result.exit_code, 0)
             ar = self.repo.commit("HEAD")
-            self.assertNotEqual(a, ar)
+            self.assertNotEqual(a.hexsha, ar.hexsha)
             self.assertNotEqual(a.authored_date, ar.authored_date)
 
     def test_redatefromstartpoint(self):
@@ -232,9 +328,9 @@ class TestGitPrivacy(unittest.TestCase):
             ar = self.repo.commit("HEAD~2")
             br = self.repo.commit("HEAD~1")
             cr = self.repo.commit("HEAD")
-            self.assertEqual(a, ar)
-            self.assertNotEqual(b, br)
-            self.assertNotEqual(c, cr)
+            self.assertEqual(a.hexsha, ar.hexsha)
+            self.assertNotEqual(b.hexsha, br.hexsha)
+            self.assertNotEqual(c.hexsha, cr.hexsha)
 
     def test_redatewrongstartpoint(self):
         with self.runner.isolated_filesystem():
@@ -273,39 +369,24 @@ class TestGitPrivacy(unittest.TestCase):
             self.assertEqual(result.exit_code, 0)
 
     def test_init(self):
-        with self.runner.isolated_filesystem():
-            self.setUpRepo()
-            self.setConfig()
-            result = self.invoke('init')
-            self.assertEqual(result.exit_code, 0)
-            self.assertEqual(result.output, os.linesep.join(
-                f"Installed {hook} hook"
-                for hook in ["post-commit", "pre-commit", "post-rewrite",
-                             "pre-push"]
-            ) + os.linesep)
-            self.assertTrue(os.access(os.path.join(".git", "hooks", "post-commit"),
-                                      os.R_OK | os.X_OK))
-            self.assertTrue(os.access(os.path.join(".git", "hooks", "pre-commit"),
-                                      os.F_OK))
-            a = self.addCommit("a")  # gitpython already returns the rewritten commit
-            self.assertEqual(a.authored_datetime,
-                             a.authored_datetime.replace(minute=0, second=0))
-
-    def test_initwithcheck(self):
-        with self.runner.isolated_filesystem():
-            self.setUpRepo()
-            self.setConfig()
-            result = self.invoke('init --timezone-change=abort')
-            self.assertEqual(result.exit_code, 0)
-            self.assertEqual(result.output, os.linesep.join(
-                f"Installed {hook} hook"
-                for hook in ["post-commit", "pre-commit", "post-rewrite",
-                             "pre-push"]
-            ) + os.linesep)
-            self.assertTrue(os.access(os.path.join(".git", "hooks", "post-commit"),
-                                      os.R_OK | os.X_OK))
-            self.assertTrue(os.access(os.path.join(".git", "hooks", "pre-commit"),
-                                      os.R_OK | os.X_OK))
+        for args in ("init", "init --timezone-change=abort"):
+            with self.subTest(args), self.runner.isolated_filesystem():
+                self.setUpRepo()
+                self.setConfig()
+                result = self.invoke(args)
+                self.assertEqual(result.exit_code, 0)
+                self.assertEqual(result.output, os.linesep.join(
+                    f"Installed {hook} hook"
+                    for hook in ["post-commit", "pre-commit", "post-rewrite",
+                                 "pre-push"]
+                ) + os.linesep)
+                self.assertTrue(os.access(os.path.join(".git", "hooks", "post-commit"),
+                                          os.R_OK | os.X_OK))
+                self.assertTrue(os.access(os.path.join(".git", "hooks", "pre-commit"),
+                                          os.R_OK | os.X_OK))
+                a = self.addCommit("a")  # gitpython already returns the rewritten commit
+                self.assertEqual(a.authored_datetime,
+                                 a.authored_datetime.replace(minute=0, second=0))
 
     def test_checkempty(self):
         with self.runner.isolated_filesystem():
@@ -338,6 +419,41 @@ class TestGitPrivacy(unittest.TestCase):
                 "Warning: Your timezone has changed"))
             self.assertEqual(result.exit_code, 2)
 
+    def test_checkchange_falsespellings(self):
+        for value in ("no", "off", "0"):
+            with self.subTest(value), self.runner.isolated_filesystem():
+                self.setUpRepo()
+                self.setConfig()
+                self.git.config(["privacy.ignoreTimezone", value])
+                os.environ['TZ'] = 'Europe/London'
+                time.tzset()
+                self.addCommit("a")
+                os.environ['TZ'] = 'Europe/Berlin'
+                time.tzset()
+                result = self.invoke('check')
+                self.assertTrue(result.output.startswith(
+                    "Warning: Your timezone has changed"))
+                self.assertEqual(result.exit_code, 2)
+
+    def test_checkchange_mailmap(self):
+        with self.runner.isolated_filesystem():
+            self.setUpRepo()
+            self.setConfig()
+            self.git.config(["privacy.ignoreTimezone", "false"])  # default is ignore
+            self.git.config(["log.mailmap", "true"])
+            # a mailmap entry must not hide the user's own commits
+            with open(".mailmap", "w") as f:
+                f.write("Canon <canon@example.com> <jdoe@example.com>\n")
+            os.environ['TZ'] = 'Europe/London'
+            time.tzset()
+            a = self.addCommit("a")
+            os.environ['TZ'] = 'Europe/Berlin'
+            time.tzset()
+            result = self.invoke('check')
+            self.assertTrue(result.output.startswith(
+                "Warning: Your timezone has changed"))
+            self.assertEqual(result.exit_code, 2)
+
     def test_checkchange_quotedmail(self):
         with self.runner.isolated_filesystem():
             self.setUpRepo()
@@ -432,8 +548,7 @@ class TestGitPrivacy(unittest.TestCase):
         with self.runner.isolated_filesystem():
             self.setUpRepo()
             self.setConfig()
-            result = self.invoke('keys --init')
-            self.assertEqual(result.exit_code, 0)
+            self.installKey()
             a = self.addCommit("a")
             result = self.invoke('log')
             self.assertEqual(result.exit_code, 0)
@@ -447,6 +562,10 @@ class TestGitPrivacy(unittest.TestCase):
             somedt = datetime(2020, 1, 1, 6, 0, tzinfo=timezone(timedelta(0, 1800)))
             self.assertEqual(utils.dt2gitdate(somedt), '1577856600 +0030')
             self.assertEqual(utils.gitdate2dt('1577856600 +0030'), somedt)
+            self.assertEqual(
+                utils.gitdate2dt('1577856600 -0930').utcoffset(),
+                -timedelta(hours=9, minutes=30),
+            )
             self.assertEqual(
                 a.authored_datetime,
                 utils.gitdate2dt(utils.dt2gitdate(a.authored_datetime)),
@@ -530,8 +649,7 @@ class TestGitPrivacy(unittest.TestCase):
         with self.runner.isolated_filesystem():
             self.setUpRepo()
             self.setConfig()
-            result = self.invoke('keys --init')
-            self.assertEqual(result.exit_code, 0)
+            self.installKey()
             a = self.addCommit("a")
             result = self.invoke('redate --only-head')
             self.assertEqual(result.exit_code, 0)
@@ -552,8 +670,7 @@ class TestGitPrivacy(unittest.TestCase):
         with self.runner.isolated_filesystem():
             self.setUpRepo()
             self.setConfig()
-            result = self.invoke('keys --init')
-            self.assertEqual(result.exit_code, 0)
+            self.installKey()
             a = self.addCommit("a")
             result = self.invoke('redate --only-head')
             self.assertEqual(result.exit_code, 0)
@@ -561,20 +678,24 @@ class TestGitPrivacy(unittest.TestCase):
             real_ad, real_cd = self.get_real_dates(ar)
             self.assertEqual(real_ad, a.authored_datetime)
             self.assertEqual(real_cd, a.committed_datetime)
-            time.sleep(1)  # make sure update commit date is different
-            res, _, _ = self.git.commit([
-                "-m",  ar.message,
-                "--amend",
-            ], with_extended_output=True)
+            # set an explicit, unredacted commit date for the amend
+            amend_cd = datetime(2020, 1, 1, 12, 34, 56, tzinfo=timezone.utc)
+            with self.git.custom_environment(
+                    GIT_COMMITTER_DATE=utils.fmtdate(amend_cd)):
+                res, _, _ = self.git.commit([
+                    "-m",  ar.message,
+                    "--amend",
+                ], with_extended_output=True)
             self.assertEqual(res, 0)
-            au = copy.copy(self.repo.head.commit)
+            au = CommitSnapshot.of(self.repo.head.commit)
             # amend updated only commit date
             self.assertEqual(au.authored_datetime, ar.authored_datetime)
             self.assertNotEqual(au.committed_datetime, ar.committed_datetime)
+            self.assertEqual(au.committed_datetime, amend_cd)
             self.assertEqual(ar.message, au.message)
             result = self.invoke('redate --only-head')
             self.assertEqual(result.exit_code, 0)
-            aur = copy.copy(self.repo.head.commit)
+            aur = CommitSnapshot.of(self.repo.head.commit)
             self.assertNotEqual(au.message, aur.message)
             u_real_ad, u_real_cd = self.get_real_dates(aur)
             self.assertEqual(au.authored_datetime, aur.authored_datetime)
@@ -586,8 +707,8 @@ class TestGitPrivacy(unittest.TestCase):
 
 
     def load_exported_commit(self, path):
-        from pkg_resources import resource_stream
-        with resource_stream('tests', path) as input_fd:
+        # a real file since the stream is handed to git as its stdin
+        with open(TESTS_DIR / path, "rb") as input_fd:
             res, stdout, stderr = self.git.fast_import(
                 "--force",  # discard existing commits
                 istream=input_fd,
@@ -694,6 +815,67 @@ class TestGitPrivacy(unittest.TestCase):
             self.assertEqual(commit.committer.name, new_name)
             self.assertEqual(commit.committer.email, email)
 
+    def test_redactemailwithunstagedchanges(self):
+        with self.runner.isolated_filesystem():
+            self.setUpRepo()
+            self.setConfig()
+            email = "privat@example.com"
+            self.git.config(["user.email", email])
+            a = self.addCommit("a")
+            with open("a", "w") as f:
+                f.write("unstagedchange")
+            result = self.invoke(f'redact-email {email}')
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn("Cannot redact: You have unstaged changes.",
+                          result.output)
+            self.assertEqual(self.repo.head.commit.hexsha, a.hexsha)
+
+    def test_redactemailduplicate(self):
+        with self.runner.isolated_filesystem():
+            self.setUpRepo()
+            self.setConfig()
+            email = "privat@example.com"
+            self.git.config(["user.email", email])
+            self.addCommit("a")
+            # the first mapping given for an address wins
+            result = self.invoke(f'redact-email {email}:first@example.com'
+                                 f' {email}:second@example.com')
+            self.assertEqual(result.exit_code, 0)
+            commit = self.repo.head.commit
+            self.assertEqual(commit.author.email, "first@example.com")
+            self.assertEqual(commit.committer.email, "first@example.com")
+
+    def test_redactemailchain(self):
+        with self.runner.isolated_filesystem():
+            self.setUpRepo()
+            self.setConfig()
+            self.git.config(["user.email", "a@example.com"])
+            self.addCommit("a")
+            self.git.config(["user.email", "b@example.com"])
+            self.addCommit("b")
+            # mappings are applied once and not followed through
+            result = self.invoke('redact-email a@example.com:b@example.com'
+                                 ' b@example.com:c@example.com')
+            self.assertEqual(result.exit_code, 0)
+            commit_a = self.repo.commit("HEAD^")
+            commit_b = self.repo.commit("HEAD")
+            self.assertEqual(commit_a.author.email, "b@example.com")
+            self.assertEqual(commit_a.committer.email, "b@example.com")
+            self.assertEqual(commit_b.author.email, "c@example.com")
+            self.assertEqual(commit_b.committer.email, "c@example.com")
+
+    def test_replacementsconfig(self):
+        for value, expected in (("yes", 1), ("on", 1), ("no", 0), ("off", 0)):
+            with self.subTest(value), self.runner.isolated_filesystem():
+                self.setUpRepo()
+                self.setConfig()
+                self.git.config(["privacy.replacements", value])
+                self.addCommit("a")
+                result = self.invoke('redate')
+                self.assertEqual(result.exit_code, 0)
+                rpls = self.git.replace("-l").splitlines()
+                self.assertEqual(len(rpls), expected)
+
     def test_globaltemplate(self):
         templdir = os.path.join(self.home, ".git_template")
         with self.runner.isolated_filesystem():
@@ -893,7 +1075,7 @@ class TestGitPrivacy(unittest.TestCase):
             result = self.invoke('redate')
             self.assertEqual(result.exit_code, 0)
             ar = self.repo.head.commit
-            self.assertNotEqual(a, ar)
+            self.assertNotEqual(a.hexsha, ar.hexsha)
             rpls = self.git.replace("-l", "--format=medium").splitlines()
             self.assertEqual(len(rpls), 1)
             self.assertIn(f"{a.hexsha} -> {ar.hexsha}", rpls)
@@ -902,7 +1084,7 @@ class TestGitPrivacy(unittest.TestCase):
             result = self.invoke('redate --only-head')
             self.assertEqual(result.exit_code, 0)
             br = self.repo.head.commit
-            self.assertNotEqual(b, br)
+            self.assertNotEqual(b.hexsha, br.hexsha)
             rpls = self.git.replace("-l", "--format=medium").splitlines()
             self.assertEqual(len(rpls), 2)
             self.assertIn(f"{b.hexsha} -> {br.hexsha}", rpls)
@@ -1134,6 +1316,36 @@ class TestGitPrivacy(unittest.TestCase):
             self.assertRegex(cm.exception.stderr,
                              fr"(?m)^{r_tomato.name}/{self.repo.active_branch}$")
 
+    def test_prepush_check_multiple_remote_branches(self):
+        with self.runner.isolated_filesystem():
+            self.setUpRepo()
+            r_origin = self.setUpRemote()
+            r_tomato = self.setUpRemote("tomato")
+            # commit before git-privacy init to produce unredacted ts
+            self.addCommit("a")
+            self.addCommit("b")
+            self.addCommit("c")
+            # publish them on two branches of tomato, one lagging behind
+            res, _stdout, _stderr = self.git.push(
+                [r_tomato.name, self.repo.active_branch,
+                 "HEAD~1:refs/heads/partial"],
+                with_extended_output=True,
+            )
+            self.assertEqual(res, 0)
+            self.setConfig()
+            result = self.invoke('init')
+            self.assertEqual(result.exit_code, 0)
+            with self.assertRaises(git.GitCommandError) as cm:
+                self.git.push(
+                    [r_origin.name, self.repo.active_branch],
+                )
+            self.assertEqual(cm.exception.status, 1)
+            # both containing branches are listed after the warning
+            warning = cm.exception.stderr.split("WARNING:", 1)[1]
+            self.assertRegex(warning,
+                             fr"(?m)^{r_tomato.name}/{self.repo.active_branch}$")
+            self.assertRegex(warning, fr"(?m)^{r_tomato.name}/partial$")
+
     def test_prepush_check_diverging_remote(self):
         with self.runner.isolated_filesystem():
             self.setUpRepo()
@@ -1152,7 +1364,7 @@ class TestGitPrivacy(unittest.TestCase):
             self.assertEqual(res, 0)
             # make a clone and push an update there
             clone = git.Repo.clone_from(r.url, "clone")
-            self.configGit(clone.git)
+            self.configGit(clone)
             self.addCommit("b", repo=clone)
             res, _stdout, _stderr = clone.git.push(
                 [r.name, clone.active_branch],
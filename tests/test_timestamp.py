@@ -39,6 +39,16 @@ class ReduceTestCase(unittest.TestCase):
                             hour=14, minute=42, second=13)
         self.assertEqual(ts.redact(self.full), expected)
 
+    def test_combined(self):
+        ts = ResolutionDateRedacter(mode="reduce", pattern="M,d,h,m,s")
+        expected = datetime(year=2018, month=1, day=1,
+                            hour=0, minute=0, second=0)
+        self.assertEqual(ts.redact(self.full), expected)
+
+    def test_empty(self):
+        ts = ResolutionDateRedacter(mode="reduce", pattern="")
+        self.assertEqual(ts.redact(self.full), self.full)
+
 
 class LimitTestCase(unittest.TestCase):
     def test_before(self):
@@ -58,3 +68,12 @@ class LimitTestCase(unittest.TestCase):
                             hour=17, minute=0, second=0)
         self.assertEqual(ts.limit, (9, 17))
         self.assertEqual(ts._enforce_limit(full), expected)
+
+    def test_tuple(self):
+        ts = ResolutionDateRedacter(limit=(9, 17))
+        self.assertEqual(ts.limit, (9, 17))
+        full = datetime(year=2018, month=12, day=18,
+                        hour=8, minute=42, second=15)
+        expected = datetime(year=2018, month=12, day=18,
+                            hour=9, minute=0, second=0)
+        self.assertEqual(ts._enforce_limit(full), expected)